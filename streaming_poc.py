@@ -1,16 +1,90 @@
 
 import asyncio
+import io
+import itertools
 import json
+import logging
+import os
+import re
 import sys
+import traceback
 import argparse
-from typing import Dict, Any, List, AsyncGenerator
+from contextlib import asynccontextmanager
+from starlette.background import BackgroundTask
+from typing import Dict, Any, List, Optional, Tuple, Union, AsyncGenerator
 from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 import httpx
+import orjson
 import uvicorn
 
+# Use uvloop (libuv-based event loop) when available - big win for this
+# I/O-bound workload with many short sleeps. Falls back to stdlib asyncio.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+
+logger = logging.getLogger(__name__)
+
+
+# Response headers every SSE endpoint sends; built once instead of per call
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+
+def _sse(obj: Any) -> bytes:
+    """Encode a payload as a complete SSE frame - orjson emits bytes directly,
+    so StreamingResponse can send the frame without a str encode step"""
+    return b"data: " + orjson.dumps(obj) + b"\n\n"
+
+
+class _CORSHeadersMiddleware:
+    """
+    Minimal pure-ASGI CORS layer: answers preflight and injects the wildcard
+    headers on the initial http.response.start message only. Starlette's
+    CORSMiddleware wraps the ASGI send for every streamed chunk, which is
+    per-frame overhead on SSE responses; in a real deployment CORS belongs on
+    the reverse proxy, and this keeps the POC browser-usable at near-zero cost.
+    """
+
+    _HEADERS = [
+        (b"access-control-allow-origin", b"*"),
+        (b"access-control-allow-methods", b"*"),
+        (b"access-control-allow-headers", b"*"),
+        (b"access-control-allow-credentials", b"true"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": list(self._HEADERS),
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + self._HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
 
 # ============================================================================
 # DATA MODELS
@@ -20,266 +94,456 @@ class QueryRequest(BaseModel):
     question: str
 
 
+class School(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    name: str
+    rating: float
+    distance: str
+    grade: str
+
+
+class PropertyDetails(BaseModel):
+    # extra='allow' keeps the schema open for fields this POC doesn't model,
+    # without falling back to Dict[str, Any] (which forces pydantic v2 into
+    # its slow any-validator instead of the Rust fast path)
+    model_config = ConfigDict(extra='allow')
+
+    id: str
+    address: str
+    price: int
+    bedrooms: int
+    bathrooms: float
+    square_feet: int
+    year_built: int
+    property_type: str
+    schools: List[School] = []
+
+
+class ChatTurn(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    role: str
+    content: str
+
+
 class PropertyChatRequest(BaseModel):
-    property_details: Dict[str, Any]
+    property_details: PropertyDetails
     user_question: str
-    chat_history: List[Dict[str, Any]] = []
+    chat_history: List[ChatTurn] = []
 
 
 # ============================================================================
 # ML SERVICE - Simulates your ML API
 # ============================================================================
 
+# Keyword -> category table for _determine_search_stages. The keyword set is
+# fixed, so it is compiled once at import into an Aho-Corasick automaton (or a
+# single alternation regex when pyahocorasick is unavailable); one C-level scan
+# of the query then replaces five Python-level any(...) substring passes.
+_STAGE_KEYWORDS: Dict[str, str] = {
+    'near': 'location', 'close': 'location', 'distance': 'location', 'location': 'location',
+    'price': 'price', 'cost': 'price', 'budget': 'price', 'affordable': 'price',
+    'cheap': 'price', 'expensive': 'price',
+    'bedroom': 'size', 'bathroom': 'size', 'room': 'size', 'size': 'size', 'square': 'size',
+    'school': 'school', 'education': 'school', 'university': 'school', 'college': 'school',
+    'park': 'amenity', 'mall': 'amenity', 'shopping': 'amenity',
+    'restaurant': 'amenity', 'amenity': 'amenity',
+}
+
+# Bit per category: a query's matched categories collapse into a small int
+# mask, which keys the fully specialized stage pipelines below.
+_CATEGORY_BITS = {'location': 1, 'price': 2, 'size': 4, 'school': 8, 'amenity': 16}
+
+try:
+    import ahocorasick
+
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _cat in _STAGE_KEYWORDS.items():
+        _KEYWORD_AUTOMATON.add_word(_kw, _cat)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+    def _match_categories(query_lower: str) -> set:
+        """Return the set of stage categories whose keywords occur in the query"""
+        return {cat for _, cat in _KEYWORD_AUTOMATON.iter(query_lower)}
+
+except ImportError:
+    # Longest-first alternation keeps substring semantics identical to the
+    # old per-keyword `in` checks (e.g. 'bedroom' still matches before 'room').
+    _KEYWORD_RE = re.compile('|'.join(sorted(_STAGE_KEYWORDS, key=len, reverse=True)))
+
+    def _match_categories(query_lower: str) -> set:
+        """Return the set of stage categories whose keywords occur in the query"""
+        return {_STAGE_KEYWORDS[kw] for kw in _KEYWORD_RE.findall(query_lower)}
+
+
+def _category_mask(query_lower: str) -> int:
+    """Collapse the matched categories into the bitmask keying _STAGES_BY_MASK"""
+    mask = 0
+    for cat in _match_categories(query_lower):
+        mask |= _CATEGORY_BITS[cat]
+    return mask
+
+
+# The simulated final results are constant, so build the dict and its encoded
+# SSE frame once at import time instead of reallocating ~2 KB and re-encoding
+# JSON on every search request.
+_FINAL_RESULTS: Dict[str, Any] = {
+    "type": "results",
+    "properties": [
+        {
+            "id": "1",
+            "address": "123 Main Street, San Francisco, CA 94102",
+            "price": 850000,
+            "bedrooms": 3,
+            "bathrooms": 2,
+            "square_feet": 1850,
+            "year_built": 2015,
+            "property_type": "Condo",
+            "schools": [
+                {"name": "Lincoln High School", "rating": 8.5, "distance": "0.3 miles", "grade": "9-12"},
+                {"name": "Roosevelt Elementary", "rating": 9.2, "distance": "0.5 miles", "grade": "K-5"},
+                {"name": "Washington Middle School", "rating": 8.8, "distance": "0.7 miles", "grade": "6-8"}
+            ]
+        },
+        {
+            "id": "2",
+            "address": "456 Oak Avenue, San Francisco, CA 94103",
+            "price": 1200000,
+            "bedrooms": 4,
+            "bathrooms": 3,
+            "square_feet": 2400,
+            "year_built": 2018,
+            "property_type": "Townhouse",
+            "schools": [
+                {"name": "Jefferson High School", "rating": 9.1, "distance": "0.4 miles", "grade": "9-12"},
+                {"name": "Madison Elementary", "rating": 9.5, "distance": "0.3 miles", "grade": "K-5"},
+                {"name": "Adams Middle School", "rating": 9.0, "distance": "0.6 miles", "grade": "6-8"},
+                {"name": "Stanford University", "rating": 9.8, "distance": "2.5 miles", "grade": "University"}
+            ]
+        },
+        {
+            "id": "3",
+            "address": "789 Pine Road, San Francisco, CA 94104",
+            "price": 650000,
+            "bedrooms": 2,
+            "bathrooms": 1,
+            "square_feet": 1200,
+            "year_built": 2010,
+            "property_type": "Apartment",
+            "schools": [
+                {"name": "Hamilton High School", "rating": 8.2, "distance": "0.8 miles", "grade": "9-12"},
+                {"name": "Franklin Elementary", "rating": 8.7, "distance": "1.0 miles", "grade": "K-5"}
+            ]
+        },
+        {
+            "id": "4",
+            "address": "321 Elm Street, San Francisco, CA 94105",
+            "price": 950000,
+            "bedrooms": 3,
+            "bathrooms": 2.5,
+            "square_feet": 2100,
+            "year_built": 2019,
+            "property_type": "Single Family",
+            "schools": [
+                {"name": "Monroe High School", "rating": 9.3, "distance": "0.2 miles", "grade": "9-12"},
+                {"name": "Jackson Elementary", "rating": 9.4, "distance": "0.4 miles", "grade": "K-5"},
+                {"name": "Van Buren Middle School", "rating": 9.1, "distance": "0.5 miles", "grade": "6-8"},
+                {"name": "UC Berkeley Extension", "rating": 9.6, "distance": "3.0 miles", "grade": "University"}
+            ]
+        },
+        {
+            "id": "5",
+            "address": "654 Maple Drive, San Francisco, CA 94106",
+            "price": 750000,
+            "bedrooms": 2,
+            "bathrooms": 2,
+            "square_feet": 1500,
+            "year_built": 2016,
+            "property_type": "Condo",
+            "schools": [
+                {"name": "Harrison High School", "rating": 8.9, "distance": "0.6 miles", "grade": "9-12"},
+                {"name": "Tyler Elementary", "rating": 8.5, "distance": "0.7 miles", "grade": "K-5"}
+            ]
+        },
+        {
+            "id": "6",
+            "address": "987 Cedar Lane, San Francisco, CA 94107",
+            "price": 1100000,
+            "bedrooms": 5,
+            "bathrooms": 4,
+            "square_feet": 3200,
+            "year_built": 2020,
+            "property_type": "Single Family",
+            "schools": [
+                {"name": "Polk High School", "rating": 9.5, "distance": "0.3 miles", "grade": "9-12"},
+                {"name": "Taylor Elementary", "rating": 9.7, "distance": "0.2 miles", "grade": "K-5"},
+                {"name": "Fillmore Middle School", "rating": 9.4, "distance": "0.4 miles", "grade": "6-8"},
+                {"name": "San Francisco State University", "rating": 9.2, "distance": "4.2 miles", "grade": "University"}
+            ]
+        }
+    ],
+    "landmarks": [
+        {"name": "Golden Gate Park", "distance": "1.2 miles", "type": "Park"},
+        {"name": "Union Square", "distance": "0.8 miles", "type": "Shopping"},
+        {"name": "Fisherman's Wharf", "distance": "2.1 miles", "type": "Attraction"},
+        {"name": "Chinatown", "distance": "1.5 miles", "type": "Neighborhood"}
+    ]
+}
+
+_FINAL_RESULTS_FRAME: bytes = _sse(_FINAL_RESULTS)
+
+# The simulated chat response is a static template after the question-echoing
+# first sentence, so the suffix is tokenized and its SSE frames pre-encoded
+# once at import; streaming the suffix then does zero JSON work per token.
+# (The per-token 'index' field was dropped to make frames cacheable - no
+# consumer read it.)
+_CHAT_SUFFIX_TEXT = (
+    "This property features excellent amenities and is located in a prime area. "
+    "The neighborhood offers great schools, shopping centers, and easy access to public transportation. "
+    "The property has been well-maintained and represents excellent value for the price. "
+    "Would you like to know more about any specific aspect of this property?"
+)
+
+_CHAT_SUFFIX_FRAMES: List[bytes] = [
+    _sse({"type": "token", "content": word + " "})
+    for word in _CHAT_SUFFIX_TEXT.split()
+]
+
+
+def _sse_raw_token(token: str) -> bytes:
+    """Encode a token for the ?proto=raw subprotocol: plain text under an
+    event: token header, no JSON envelope. Control events stay JSON."""
+    return b"event: token\ndata: " + token.encode('utf-8') + b"\n\n"
+
+
+_CHAT_SUFFIX_FRAMES_RAW: List[bytes] = [
+    _sse_raw_token(word + " ") for word in _CHAT_SUFFIX_TEXT.split()
+]
+
+_CHAT_DONE_FRAME: bytes = _sse({'type': 'done', 'message': 'Response complete'})
+
+
 class MLService:
     """
     ML Service - Simulates the actual ML API that processes queries
     This would be your ml-api service
     """
-    
+
+    # Typewriter cadence: batching a few characters per SSE frame keeps the
+    # visual effect while cutting event-loop wakeups and wire framing ~4x
+    # versus one frame per character.
+    CHARS_PER_TICK = 4
+    TICK = 0.1
+
+    # Target interval between chat tokens
+    TOKEN_INTERVAL = 0.05
+
     @staticmethod
-    def _determine_search_stages(query: str) -> List[str]:
+    def _stage_messages_for_mask(mask: int) -> List[str]:
         """
-        Dynamically determine search stages based on query content
-        In real implementation, this would analyze the query to determine processing steps
+        Static stage messages for one keyword-category bitmask
+        The query-echoing first stage is built per request; everything here is
+        specialized once at import into _STAGES_BY_MASK
         """
-        query_lower = query.lower()
         stages = []
-        
-        # Always start with parsing
-        stages.append(f"Analyzing your search: '{query}'")
-        
-        # Determine stages based on query keywords
-        if any(word in query_lower for word in ['near', 'close', 'distance', 'location']):
+
+        if mask & _CATEGORY_BITS['location']:
             stages.append("Identifying location requirements...")
             stages.append("Searching properties by location...")
             stages.append("Calculating distances to amenities...")
-        
-        if any(word in query_lower for word in ['price', 'cost', 'budget', 'affordable', 'cheap', 'expensive']):
+
+        if mask & _CATEGORY_BITS['price']:
             stages.append("Filtering by price range...")
             stages.append("Analyzing property values...")
-        
-        if any(word in query_lower for word in ['bedroom', 'bathroom', 'room', 'size', 'square']):
+
+        if mask & _CATEGORY_BITS['size']:
             stages.append("Matching property specifications...")
             stages.append("Filtering by size requirements...")
-        
-        if any(word in query_lower for word in ['school', 'education', 'university', 'college']):
+
+        if mask & _CATEGORY_BITS['school']:
             stages.append("Finding nearby schools...")
             stages.append("Gathering school ratings...")
-        
-        if any(word in query_lower for word in ['park', 'mall', 'shopping', 'restaurant', 'amenity']):
+
+        if mask & _CATEGORY_BITS['amenity']:
             stages.append("Searching nearby amenities...")
             stages.append("Enriching with landmark data...")
-        
+
         # Default stages if no specific keywords found
-        if len(stages) == 1:  # Only has the initial parsing stage
+        if not stages:
             stages.extend([
                 "Searching property database...",
                 "Filtering results by criteria...",
                 "Ranking properties by relevance...",
                 "Enriching with additional data..."
             ])
-        
+
         return stages
-    
+
+    @staticmethod
+    def _stage_entry(message: str) -> Tuple[List[bytes], bytes, float]:
+        """
+        Fully specialized emission plan for one stage: pre-encoded typewriter
+        frames, pre-encoded completion frame, and the pre-baked post-stage
+        idle (3 seconds per stage minus time spent ticking)
+        """
+        frames = MLService._stage_frames(message)
+        progress_frame = _sse({
+            'type': 'progress',
+            'message': message,
+            'replace': True,
+            'is_complete': True
+        })
+        post_sleep = max(0.0, 3.0 - len(frames) * MLService.TICK)
+        return frames, progress_frame, post_sleep
+
     @staticmethod
-    async def stream_search_progress(query: str) -> AsyncGenerator[str, None]:
+    def _stage_frames(message: str) -> List[bytes]:
+        """
+        Pre-encode every typewriter frame for one stage message
+        Prefixes are sliced from the stage string (C-level, shares storage)
+        rather than accumulated with += which is O(n^2) across the loop
+        """
+        ends = list(range(MLService.CHARS_PER_TICK, len(message) + 1,
+                          MLService.CHARS_PER_TICK))
+        if not ends or ends[-1] != len(message):
+            ends.append(len(message))  # final partial batch
+        return [_sse({
+            'type': 'progress_char',
+            'message': message[:j],
+            'is_complete': False,
+            'replace': True
+        }) for j in ends]
+
+    @staticmethod
+    async def _produce_search_frames(query: str, queue: asyncio.Queue) -> None:
+        """
+        Producer half of stream_search_progress: queues (frame, post-yield
+        delay) pairs, so frame prep overlaps the consumer's network flushes
+        Static stages come pre-encoded from _STAGES_BY_MASK; only the
+        query-echoing first stage is encoded per request
+        """
+        # Case-fold without allocating a copy in the common case: typed search
+        # queries are almost always ASCII lowercase already, so only pay for
+        # .lower() when the query actually contains uppercase (or non-ASCII,
+        # where case-folding rules are more involved).
+        if query.isascii() and not any(c.isupper() for c in query):
+            query_lower = query
+        else:
+            query_lower = query.lower()
+
+        stages = [MLService._stage_entry(f"Analyzing your search: '{query}'")]
+        stages += _STAGES_BY_MASK[_category_mask(query_lower)]
+
+        for i, (frames, progress_frame, post_sleep) in enumerate(stages):
+            for frame in frames:
+                await queue.put((frame, MLService.TICK))
+
+            # Completion signal for this message, then the inter-stage idle
+            await queue.put((progress_frame, post_sleep))
+
+            logger.debug("[ML Service] Queued progress %d/%d", i + 1, len(stages))
+
+        # Final results: a single yield of the cached frame. The server's
+        # writer flushes each yielded chunk as-is, so the historical trailing
+        # sleep "to ensure delivery" is unnecessary. (If this payload ever
+        # grows past ~64 KB, serve it from a file or yield a memoryview to
+        # stay copy-free.)
+        logger.info("[ML Service] Sending final results: %d properties", len(_FINAL_RESULTS['properties']))
+        await queue.put((_FINAL_RESULTS_FRAME, 0.0))
+        await queue.put(None)
+
+    @staticmethod
+    async def stream_search_progress(query: str) -> AsyncGenerator[bytes, None]:
         """
         Simulates search processing with progress updates
         In real implementation, this would call your actual search agents
+
+        A bounded queue decouples frame preparation (producer task) from the
+        timed emission here, so the event loop can run the producer while the
+        previous frame is still being flushed to the socket
         """
-        print(f"[ML Service] Starting search for: {query}")
-        
-        # Dynamically determine stages based on query
-        stages = MLService._determine_search_stages(query)
-        
-        # Stream each stage as SSE event character by character
-        for i, message in enumerate(stages):
-            # Stream message character by character
-            accumulated_message = ""
-            for char in message:
-                accumulated_message += char
-                # Send each character as it's typed
-                data = json.dumps({
-                    'type': 'progress_char',
-                    'char': char,
-                    'message': accumulated_message,
-                    'is_complete': False,
-                    'replace': True
-                })
-                yield f"data: {data}\n\n"
-                await asyncio.sleep(0.03)  # Small delay between characters for smooth typing effect
-            
-            # Send completion signal for this message
-            data = json.dumps({
-                'type': 'progress',
-                'message': accumulated_message,
-                'replace': True,
-                'is_complete': True
-            })
-            yield f"data: {data}\n\n"
-            
-            print(f"[ML Service] Sent progress {i+1}/{len(stages)}: {message}")
-            
-            # Wait before starting next message (3 seconds total, minus time spent typing)
-            typing_time = len(message) * 0.03
-            wait_time = max(0, 3.0 - typing_time)
-            await asyncio.sleep(wait_time)
-        
-        # Send final results with more properties
-        results = {
-            "type": "results",
-            "properties": [
-                {
-                    "id": "1",
-                    "address": "123 Main Street, San Francisco, CA 94102",
-                    "price": 850000,
-                    "bedrooms": 3,
-                    "bathrooms": 2,
-                    "square_feet": 1850,
-                    "year_built": 2015,
-                    "property_type": "Condo",
-                    "schools": [
-                        {"name": "Lincoln High School", "rating": 8.5, "distance": "0.3 miles", "grade": "9-12"},
-                        {"name": "Roosevelt Elementary", "rating": 9.2, "distance": "0.5 miles", "grade": "K-5"},
-                        {"name": "Washington Middle School", "rating": 8.8, "distance": "0.7 miles", "grade": "6-8"}
-                    ]
-                },
-                {
-                    "id": "2",
-                    "address": "456 Oak Avenue, San Francisco, CA 94103",
-                    "price": 1200000,
-                    "bedrooms": 4,
-                    "bathrooms": 3,
-                    "square_feet": 2400,
-                    "year_built": 2018,
-                    "property_type": "Townhouse",
-                    "schools": [
-                        {"name": "Jefferson High School", "rating": 9.1, "distance": "0.4 miles", "grade": "9-12"},
-                        {"name": "Madison Elementary", "rating": 9.5, "distance": "0.3 miles", "grade": "K-5"},
-                        {"name": "Adams Middle School", "rating": 9.0, "distance": "0.6 miles", "grade": "6-8"},
-                        {"name": "Stanford University", "rating": 9.8, "distance": "2.5 miles", "grade": "University"}
-                    ]
-                },
-                {
-                    "id": "3",
-                    "address": "789 Pine Road, San Francisco, CA 94104",
-                    "price": 650000,
-                    "bedrooms": 2,
-                    "bathrooms": 1,
-                    "square_feet": 1200,
-                    "year_built": 2010,
-                    "property_type": "Apartment",
-                    "schools": [
-                        {"name": "Hamilton High School", "rating": 8.2, "distance": "0.8 miles", "grade": "9-12"},
-                        {"name": "Franklin Elementary", "rating": 8.7, "distance": "1.0 miles", "grade": "K-5"}
-                    ]
-                },
-                {
-                    "id": "4",
-                    "address": "321 Elm Street, San Francisco, CA 94105",
-                    "price": 950000,
-                    "bedrooms": 3,
-                    "bathrooms": 2.5,
-                    "square_feet": 2100,
-                    "year_built": 2019,
-                    "property_type": "Single Family",
-                    "schools": [
-                        {"name": "Monroe High School", "rating": 9.3, "distance": "0.2 miles", "grade": "9-12"},
-                        {"name": "Jackson Elementary", "rating": 9.4, "distance": "0.4 miles", "grade": "K-5"},
-                        {"name": "Van Buren Middle School", "rating": 9.1, "distance": "0.5 miles", "grade": "6-8"},
-                        {"name": "UC Berkeley Extension", "rating": 9.6, "distance": "3.0 miles", "grade": "University"}
-                    ]
-                },
-                {
-                    "id": "5",
-                    "address": "654 Maple Drive, San Francisco, CA 94106",
-                    "price": 750000,
-                    "bedrooms": 2,
-                    "bathrooms": 2,
-                    "square_feet": 1500,
-                    "year_built": 2016,
-                    "property_type": "Condo",
-                    "schools": [
-                        {"name": "Harrison High School", "rating": 8.9, "distance": "0.6 miles", "grade": "9-12"},
-                        {"name": "Tyler Elementary", "rating": 8.5, "distance": "0.7 miles", "grade": "K-5"}
-                    ]
-                },
-                {
-                    "id": "6",
-                    "address": "987 Cedar Lane, San Francisco, CA 94107",
-                    "price": 1100000,
-                    "bedrooms": 5,
-                    "bathrooms": 4,
-                    "square_feet": 3200,
-                    "year_built": 2020,
-                    "property_type": "Single Family",
-                    "schools": [
-                        {"name": "Polk High School", "rating": 9.5, "distance": "0.3 miles", "grade": "9-12"},
-                        {"name": "Taylor Elementary", "rating": 9.7, "distance": "0.2 miles", "grade": "K-5"},
-                        {"name": "Fillmore Middle School", "rating": 9.4, "distance": "0.4 miles", "grade": "6-8"},
-                        {"name": "San Francisco State University", "rating": 9.2, "distance": "4.2 miles", "grade": "University"}
-                    ]
-                }
-            ],
-            "landmarks": [
-                {"name": "Golden Gate Park", "distance": "1.2 miles", "type": "Park"},
-                {"name": "Union Square", "distance": "0.8 miles", "type": "Shopping"},
-                {"name": "Fisherman's Wharf", "distance": "2.1 miles", "type": "Attraction"},
-                {"name": "Chinatown", "distance": "1.5 miles", "type": "Neighborhood"}
-            ]
-        }
-        print(f"[ML Service] Sending final results: {len(results['properties'])} properties")
-        results_json = json.dumps(results)
-        yield f"data: {results_json}\n\n"
-        # Ensure final data is sent
-        await asyncio.sleep(0.01)
-    
+        logger.info("[ML Service] Starting search for: %s", query)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+        producer = asyncio.create_task(MLService._produce_search_frames(query, queue))
+
+        # Same monotonic pacing as the chat stream: accumulate the schedule
+        # and sleep only for the remainder, so timer jitter never compounds
+        # across a stage's worth of ticks.
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        try:
+            while (item := await queue.get()) is not None:
+                frame, delay = item
+                yield frame
+                next_at += delay
+                remaining = next_at - loop.time()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+        finally:
+            # Covers early client disconnects as well as normal completion
+            producer.cancel()
+
     @staticmethod
-    async def stream_chat_response(user_question: str, property_details: Dict[str, Any]) -> AsyncGenerator[str, None]:
+    async def stream_chat_response(user_question: str, property_details: PropertyDetails,
+                                   raw: bool = False) -> AsyncGenerator[bytes, None]:
         """
         Simulates ChatGPT-like streaming response
         In real implementation, this would call your LLM (like property_chat_service)
+
+        With raw=True (?proto=raw) tokens go out as plain text under an
+        event: token header - for one-word tokens the JSON envelope is most
+        of the frame, so this cuts both wire bytes and client parse work.
         """
-        print(f"[ML Service] Generating chat response for: {user_question}")
-        
-        # Simulate LLM response generation (word by word)
-        response_text = (
-            f"Based on the property details you've shared, {user_question.lower()}. "
-            "This property features excellent amenities and is located in a prime area. "
-            "The neighborhood offers great schools, shopping centers, and easy access to public transportation. "
-            "The property has been well-maintained and represents excellent value for the price. "
-            "Would you like to know more about any specific aspect of this property?"
-        )
-        
-        # Stream word by word (like ChatGPT)
-        words = response_text.split()
-        for i, word in enumerate(words):
-            await asyncio.sleep(0.05)  # Small delay to simulate streaming
-            chunk = {
-                "type": "token",
-                "content": word + " ",
-                "index": i
-            }
-            yield f"data: {json.dumps(chunk)}\n\n"
-        
+        logger.info("[ML Service] Generating chat response for: %s", user_question)
+
+        # Only the prefix depends on the request; encode its tokens here and
+        # stream the static suffix from the import-time cache
+        prefix = f"Based on the property details you've shared, {user_question.lower()}. "
+        if raw:
+            prefix_frames = [_sse_raw_token(word + " ") for word in prefix.split()]
+            suffix_frames = _CHAT_SUFFIX_FRAMES_RAW
+        else:
+            prefix_frames = [_sse({"type": "token", "content": word + " "})
+                             for word in prefix.split()]
+            suffix_frames = _CHAT_SUFFIX_FRAMES
+
+        # Stream word by word (like ChatGPT), pacing against the monotonic
+        # loop clock: each token has a target emit time, and we only sleep
+        # when ahead of schedule. If the loop is busy and we fall behind,
+        # tokens go out back-to-back instead of stacking up late wakeups.
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i, frame in enumerate(itertools.chain(prefix_frames, suffix_frames)):
+            delay = start + (i + 1) * MLService.TOKEN_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield frame
+
         # Send completion signal
-        print("[ML Service] Chat response complete")
-        yield f"data: {json.dumps({'type': 'done', 'message': 'Response complete'})}\n\n"
+        logger.info("[ML Service] Chat response complete")
+        yield _CHAT_DONE_FRAME
+
+
+# Partial evaluation of the stage pipeline: five keyword categories mean only
+# 2^5 possible static stage sequences, so each one - typewriter frames,
+# completion frames, and idle times included - is specialized once at import.
+# Per request the remaining work is one automaton scan -> bitmask -> lookup.
+_STAGES_BY_MASK: Dict[int, List[Tuple[List[bytes], bytes, float]]] = {
+    mask: [MLService._stage_entry(message)
+           for message in MLService._stage_messages_for_mask(mask)]
+    for mask in range(2 ** len(_CATEGORY_BITS))
+}
 
 
 # ============================================================================
 # ML SERVICE API (FastAPI App)
 # ============================================================================
 
-ml_app = FastAPI(title="ML Service - Streaming")
+ml_app = FastAPI(title="ML Service - Streaming", default_response_class=ORJSONResponse)
 
-ml_app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+ml_app.add_middleware(_CORSHeadersMiddleware)
 
 
 @ml_app.post("/query/stream")
@@ -288,33 +552,26 @@ async def ml_query_stream(request: QueryRequest):
     ML Service endpoint - Streams search progress
     This is what your ml-api/main.py /query endpoint would look like with streaming
     """
-    print(f"[ML API] Received search request: {request.question}")
+    logger.info("[ML API] Received search request: %s", request.question)
     return StreamingResponse(
         MLService.stream_search_progress(request.question),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=_SSE_HEADERS
     )
 
 
 @ml_app.post("/property_chat/stream")
-async def ml_chat_stream(request: PropertyChatRequest):
+async def ml_chat_stream(request: PropertyChatRequest, proto: str = "json"):
     """
     ML Service endpoint - Streams chat response
     This is what your ml-api/main.py /property_chat endpoint would look like with streaming
     """
-    print(f"[ML API] Received chat request: {request.user_question}")
+    logger.info("[ML API] Received chat request: %s", request.user_question)
     return StreamingResponse(
-        MLService.stream_chat_response(request.user_question, request.property_details),
+        MLService.stream_chat_response(request.user_question, request.property_details,
+                                       raw=(proto == "raw")),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=_SSE_HEADERS
     )
 
 
@@ -332,115 +589,98 @@ class BackendAPI:
     Backend API - Proxies requests to ML Service and streams responses
     This is what your backend-api would do
     """
-    
+
     ML_SERVICE_URL = "http://localhost:8001"
-    
+
+    # Shared pooled client, created once in the backend_app lifespan. Reusing
+    # one client keeps connections to the ML service alive across requests
+    # instead of paying TCP (and DNS/TLS) setup per proxied call.
+    _client: httpx.AsyncClient = None
+
+
     @staticmethod
-    async def proxy_search_stream(query: str) -> AsyncGenerator[str, None]:
+    async def open_search_stream(query: str) -> httpx.Response:
         """
-        Proxies search request to ML service and forwards SSE stream
+        Opens the upstream ML-service search stream and returns the live
+        response, headers read but body unconsumed - the endpoint hands the
+        response's byte iterator straight to StreamingResponse
         This is what your backend-api/app/api/routes/search.py would do
         """
-        print(f"[Backend API] Proxying search request: {query}")
-        
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            payload = {"question": query}
-            
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{BackendAPI.ML_SERVICE_URL}/query/stream",
-                    json=payload
-                ) as response:
-                    print(f"[Backend API] Connected to ML service, status: {response.status_code}")
-                    
-                    if response.status_code != 200:
-                        error_msg = await response.aread()
-                        error_text = error_msg.decode() if error_msg else "Unknown error"
-                        print(f"[Backend API] ML service error: {response.status_code} - {error_text}")
-                        yield f"data: {json.dumps({'error': f'ML service error: {response.status_code}', 'details': error_text})}\n\n"
-                        return
-                    
-                    try:
-                        async for line in response.aiter_lines():
-                            if not line.strip():
-                                continue  # Skip empty lines
-                            
-                            if line.startswith("data: "):
-                                # Forward the SSE data as-is
-                                print(f"[Backend API] Forwarding SSE data: {line[:50]}...")
-                                yield f"{line}\n"
-                            elif line.strip() and not line.startswith(":"):
-                                # Handle any other non-comment lines
-                                yield f"data: {json.dumps({'error': line})}\n\n"
-                    except Exception as stream_error:
-                        print(f"[Backend API] Stream error: {stream_error}")
-                        yield f"data: {json.dumps({'error': f'Stream error: {str(stream_error)}'})}\n\n"
-            
-            except httpx.ConnectError as e:
-                error_msg = f"Cannot connect to ML service at {BackendAPI.ML_SERVICE_URL}. Make sure ML service is running."
-                print(f"[Backend API] Connection Error: {error_msg}")
-                yield f"data: {json.dumps({'error': error_msg})}\n\n"
-            except Exception as e:
-                print(f"[Backend API] Error: {e}")
-                import traceback
-                traceback.print_exc()
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-    
+        logger.info("[Backend API] Proxying search request: %s", query)
+
+        request = BackendAPI._client.build_request(
+            "POST",
+            f"{BackendAPI.ML_SERVICE_URL}/query/stream",
+            json={"question": query}
+        )
+        response = await BackendAPI._client.send(request, stream=True)
+        logger.debug("[Backend API] Connected to ML service, status: %s", response.status_code)
+        return response
+
     @staticmethod
-    async def proxy_chat_stream(
-        property_details: Dict[str, Any],
-        user_question: str,
-        chat_history: List[Dict[str, Any]]
-    ) -> AsyncGenerator[str, None]:
+    async def proxy_chat_stream(chat_request: PropertyChatRequest, proto: str = "json") -> AsyncGenerator[bytes, None]:
         """
         Proxies chat request to ML service and forwards SSE stream
         This is what your backend-api/app/services/chat_service.py would do
         """
-        print(f"[Backend API] Proxying chat request: {user_question}")
-        
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            payload = {
-                "property_details": property_details,
-                "user_question": user_question,
-                "chat_history": chat_history
-            }
-            
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{BackendAPI.ML_SERVICE_URL}/property_chat/stream",
-                    json=payload
-                ) as response:
-                    print(f"[Backend API] Connected to ML service, status: {response.status_code}")
-                    
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            # Forward the SSE data as-is
-                            print(f"[Backend API] Forwarding SSE data: {line[:50]}...")
-                            yield f"{line}\n"
-                        elif line.strip():
-                            # Handle any other lines
-                            yield f"data: {json.dumps({'error': line})}\n\n"
-            except Exception as e:
-                print(f"[Backend API] Error: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        logger.info("[Backend API] Proxying chat request: %s", chat_request.user_question)
+
+        # model_dump_json serializes through pydantic-core (Rust), and the
+        # string goes out as the body directly - no intermediate dict or
+        # second json.dumps pass
+        body = chat_request.model_dump_json()
+
+        try:
+            async with BackendAPI._client.stream(
+                "POST",
+                f"{BackendAPI.ML_SERVICE_URL}/property_chat/stream",
+                params={"proto": proto},
+                content=body,
+                headers={"content-type": "application/json"}
+            ) as response:
+                logger.debug("[Backend API] Connected to ML service, status: %s", response.status_code)
+
+                # Forward the upstream SSE bytes verbatim (see search proxy).
+                # A fixed chunk size keeps per-connection buffering bounded -
+                # no line-oriented accumulation between yields.
+                async for chunk in response.aiter_raw(chunk_size=4096):
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("[Backend API] Forwarding %d bytes", len(chunk))
+                    yield chunk
+        except Exception as e:
+            logger.exception("[Backend API] Error: %s", e)
+            yield _sse({'error': str(e)})
 
 
 # ============================================================================
 # BACKEND API (FastAPI App)
 # ============================================================================
 
-backend_app = FastAPI(title="Backend API - Streaming Proxy")
+@asynccontextmanager
+async def _backend_lifespan(app: FastAPI):
+    """Create the shared ML-service client on startup, close it on shutdown"""
+    # http2=True lets all concurrent SSE streams multiplex over one TCP+TLS
+    # connection when the ML service (or the proxy fronting it) negotiates h2
+    # via ALPN; over plain HTTP/1.1 the flag is inert and keep-alive pooling
+    # still applies.
+    BackendAPI._client = httpx.AsyncClient(
+        timeout=60.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+    )
+    yield
+    await BackendAPI._client.aclose()
+    BackendAPI._client = None
+
 
-backend_app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+backend_app = FastAPI(
+    title="Backend API - Streaming Proxy",
+    default_response_class=ORJSONResponse,
+    lifespan=_backend_lifespan,
 )
 
+backend_app.add_middleware(_CORSHeadersMiddleware)
+
 
 @backend_app.get("/search/stream")
 async def backend_search_stream(query: str):
@@ -448,37 +688,52 @@ async def backend_search_stream(query: str):
     Backend API endpoint - Streams search results with progress
     This is what your backend-api/app/api/routes/search.py /search endpoint would look like
     """
-    print(f"[Backend API] Received search request: {query}")
+    logger.info("[Backend API] Received search request: %s", query)
+
+    try:
+        upstream = await BackendAPI.open_search_stream(query)
+    except httpx.ConnectError:
+        error_msg = f"Cannot connect to ML service at {BackendAPI.ML_SERVICE_URL}. Make sure ML service is running."
+        logger.error("[Backend API] Connection Error: %s", error_msg)
+        return StreamingResponse(
+            iter([_sse({'error': error_msg})]),
+            media_type="text/event-stream",
+            headers=_SSE_HEADERS
+        )
+
+    if upstream.status_code != 200:
+        error_msg = await upstream.aread()
+        await upstream.aclose()
+        error_text = error_msg.decode() if error_msg else "Unknown error"
+        logger.error("[Backend API] ML service error: %s - %s", upstream.status_code, error_text)
+        return StreamingResponse(
+            iter([_sse({'error': f'ML service error: {upstream.status_code}', 'details': error_text})]),
+            media_type="text/event-stream",
+            headers=_SSE_HEADERS
+        )
+
+    # The upstream already emits well-formed SSE, so its byte iterator goes
+    # straight to StreamingResponse - no middle generator frame per chunk.
+    # The BackgroundTask closes the upstream response after the last byte.
     return StreamingResponse(
-        BackendAPI.proxy_search_stream(query),
+        upstream.aiter_raw(chunk_size=4096),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=_SSE_HEADERS,
+        background=BackgroundTask(upstream.aclose)
     )
 
 
 @backend_app.post("/chat/stream")
-async def backend_chat_stream(request: PropertyChatRequest):
+async def backend_chat_stream(request: PropertyChatRequest, proto: str = "json"):
     """
     Backend API endpoint - Streams chat response
     This is what your backend-api/app/api/routes/chat.py would look like
     """
-    print(f"[Backend API] Received chat request: {request.user_question}")
+    logger.info("[Backend API] Received chat request: %s", request.user_question)
     return StreamingResponse(
-        BackendAPI.proxy_chat_stream(
-            request.property_details,
-            request.user_question,
-            request.chat_history
-        ),
+        BackendAPI.proxy_chat_stream(request, proto),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=_SSE_HEADERS
     )
 
 
@@ -491,6 +746,113 @@ async def backend_health():
 # CLIENT - Terminal client to test streaming
 # ============================================================================
 
+# Shared connection pool for the test client. A fresh AsyncClient per call
+# pays TCP (and TLS, if any) setup on every invocation; one lazy singleton
+# lets repeated searches in a process reuse keepalive sockets.
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient, creating it on first use"""
+    global _CLIENT
+    if _CLIENT is None:
+        # http2=True negotiates h2 via ALPN when the backend offers it, so
+        # concurrent search + chat streams multiplex over one connection;
+        # over plain HTTP/1.1 it is inert and costs nothing.
+        _CLIENT = httpx.AsyncClient(
+            timeout=60.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        )
+    return _CLIENT
+
+
+async def _close_client():
+    """Close the shared client; run_test calls this once per process"""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+# One event per match: everything up to a blank-line terminator, CRLF
+# tolerated. C-level finditer replaces the Python find/slice/delete loop.
+_SSE_RE = re.compile(rb"(.+?)\r?\n\r?\n", re.DOTALL)
+
+
+async def iter_sse_events(response: httpx.Response) -> AsyncGenerator[bytes, None]:
+    """
+    Incremental SSE framer: accumulate raw bytes and yield each complete
+    event (the block before a blank line) as soon as its terminator arrives.
+
+    aiter_lines() decodes the whole body to str and re-splits it on every
+    chunk; framing on bytes avoids the per-line decode and allocation, and
+    hands orjson the bytes input it parses fastest.
+
+    Reads come from aiter_raw - SSE is never content-encoded here, so the
+    decoding pass aiter_bytes layers on top is pure overhead - with a large
+    read size so a burst of tokens costs one async tick, not one per chunk.
+    One _SSE_RE pass per read then extracts every complete frame in C
+    instead of a find/slice/delete round per event, and the buffer is
+    trimmed once per chunk rather than once per frame.
+    """
+    buf = bytearray()
+    async for chunk in response.aiter_raw(chunk_size=32768):
+        buf += chunk
+        last = 0
+        for match in _SSE_RE.finditer(buf):
+            yield match.group(1)
+            last = match.end()
+        if last:
+            del buf[:last]
+
+
+# ANSI clear-line: 4 bytes replace the "\r + 80 spaces + \r" redraw dance.
+# When stdout is piped rather than a TTY, degrade to a bare carriage return
+# so captured output is not littered with escape codes.
+_CLR = "\r\x1b[2K" if sys.stdout.isatty() else "\r"
+
+# Raw fd for the redraw hot path: os.write skips the TextIOWrapper lock,
+# encode and flush machinery that print() pays on every progress frame.
+# Only used on a real TTY - when piped, the buffered writer is kept so
+# output interleaves correctly with surrounding print() calls.
+_STDOUT_FD = sys.stdout.fileno() if sys.stdout.isatty() else None
+
+
+def _clear_progress_line(current_message: str):
+    """Clear any in-progress status line and move to a fresh line - one
+    write+flush instead of a clear print followed by a newline print"""
+    sys.stdout.write(_CLR + "\n" if current_message else "\n")
+    sys.stdout.flush()
+
+
+def _write_progress(text: str):
+    """One-syscall terminal write on a TTY, buffered write+flush otherwise"""
+    if _STDOUT_FD is not None:
+        os.write(_STDOUT_FD, text.encode('utf-8'))
+    else:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+def _sse_data(event: bytes) -> Optional[Union[bytes, memoryview]]:
+    """
+    Pull the payload out of a framed SSE event, or None for comment /
+    non-data events. Stays in bytes - one prefix compare on the common
+    single-line case, spec-style join only when a frame has multiple
+    data lines. The fast path hands back a memoryview so orjson parses
+    straight out of the event buffer with no payload copy.
+    """
+    if b"\n" not in event:
+        if event.startswith(b"data: "):
+            return memoryview(event)[6:]
+        if event.startswith(b"data:"):
+            return event[5:].lstrip()
+        return None
+    parts = [line[5:].lstrip() for line in event.split(b"\n") if line.startswith(b"data:")]
+    return b"\n".join(parts) if parts else None
+
+
 class Client:
     """
     Terminal client to test SSE streaming
@@ -512,164 +874,220 @@ class Client:
         
         current_message = ""
         
+        # Handlers keyed by event type: one dict lookup per frame replaces
+        # the chained type comparisons, and each handler returns True when
+        # the stream is finished.
+        def handle_progress_char(data):
+            nonlocal current_message
+            # Character-by-character streaming
+            accumulated = data.get("message", "")
+            
+            # Check if this is the start of a new message
+            # New message if: no current message, or accumulated doesn't start
+            # with current. The length gate and last-char probe reject the
+            # common append-only case in O(1) before the full prefix compare.
+            lc = len(current_message)
+            is_new_message = (
+                lc == 0
+                or len(accumulated) < lc
+                or accumulated[lc - 1] != current_message[-1]
+                or not accumulated.startswith(current_message)
+            )
+            
+            if is_new_message:
+                # Restart: clear the line once and redraw from scratch
+                _write_progress(f"{_CLR}🔄 {accumulated}")
+            else:
+                # Continuation of the current message: the prefix is
+                # already on screen, so emit only the new suffix.
+                # Rewriting the whole line per character is quadratic
+                # in message length; the delta is O(total chars).
+                _write_progress(accumulated[lc:])
+            current_message = accumulated
+            return False
+        
+        def handle_progress(data):
+            nonlocal current_message
+            # Complete progress message (final state)
+            message = data.get("message", "")
+            
+            # Ensure complete message is displayed
+            if current_message != message:
+                _write_progress(f"{_CLR}🔄 {message}")
+            current_message = message
+            return False
+        
+        def handle_results(data):
+            # Assemble the whole report in memory and emit it as one write -
+            # the per-field print calls were dozens of flushes, and pulling
+            # each dict value once into a local drops the repeated .get()
+            # hashing in the per-property loop.
+            parts = []
+            
+            # Clear the progress line completely, then move to a new line
+            if current_message:
+                parts.append(_CLR)
+            parts.append("\n")
+            
+            parts.append(f"\n{'='*70}\n✅ SEARCH RESULTS:\n{'='*70}\n")
+            
+            if "properties" in data:
+                parts.append("\n📋 Properties Found:\n")
+                for prop in data["properties"]:
+                    address = prop.get('address', 'N/A')
+                    price = prop.get('price', 'N/A')
+                    bedrooms = prop.get('bedrooms', 'N/A')
+                    bathrooms = prop.get('bathrooms', 'N/A')
+                    square_feet = prop.get('square_feet', 'N/A')
+                    property_type = prop.get('property_type', 'N/A')
+                    year_built = prop.get('year_built', 'N/A')
+                    parts.append(f"\n   • {address}\n"
+                                 f"     Price: ${price:,} | "
+                                 f"Bedrooms: {bedrooms} | "
+                                 f"Bathrooms: {bathrooms} | "
+                                 f"Size: {square_feet} sq ft\n"
+                                 f"     Type: {property_type} | "
+                                 f"Year Built: {year_built}\n")
+                    
+                    # Show schools data
+                    schools = prop.get("schools")
+                    if schools:
+                        parts.append("     🎓 Nearby Schools:\n")
+                        for school in schools:
+                            name = school.get('name', 'N/A')
+                            rating = school.get('rating', 'N/A')
+                            distance = school.get('distance', 'N/A')
+                            grade = school.get('grade', 'N/A')
+                            parts.append(f"        - {name} "
+                                         f"(Rating: {rating}/10, "
+                                         f"Distance: {distance}, "
+                                         f"Grade: {grade})\n")
+            
+            if "landmarks" in data:
+                parts.append("\n📍 Nearby Landmarks:\n")
+                for landmark in data["landmarks"]:
+                    name = landmark.get('name', 'N/A')
+                    distance = landmark.get('distance', 'N/A')
+                    landmark_type = landmark.get('type', 'N/A')
+                    parts.append(f"   • {name} ({distance}) - {landmark_type}\n")
+            parts.append("\n")
+            
+            sys.stdout.write("".join(parts))
+            sys.stdout.flush()
+            return True  # Exit loop after results
+        
+        def handle_progress_chars(data):
+            nonlocal current_message
+            # Batched form of progress_char: one frame carries a list of
+            # appended deltas, amortizing the SSE framing and JSON envelope
+            # across many characters. Deltas are always continuations, so
+            # render the whole batch as one write.
+            delta = "".join(data.get("chunks", ()))
+            _write_progress(delta)
+            current_message += delta
+            return False
+        
+        handlers = {
+            "progress_char": handle_progress_char,
+            "progress_chars": handle_progress_chars,
+            "progress": handle_progress,
+            "results": handle_results,
+        }
+        
+        client = _get_client()
+        
+        # SSE reconnection state: when the stream drops mid-response after
+        # an id: line has been seen, resume with Last-Event-ID instead of
+        # re-running the whole search from scratch.
+        last_id = None
+        attempts_left = 3
+        event_count = 0
+        
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            while True:
                 try:
                     async with client.stream(
                         "GET",
                         f"{Client.BACKEND_URL}/search/stream",
-                        params={"query": query}
+                        params={"query": query},
+                        headers={"Last-Event-ID": last_id} if last_id else None
                     ) as response:
                         print(f"[Client] Connected to backend, status: {response.status_code}\n")
-                        
+                
                         if response.status_code != 200:
                             error_text = await response.aread()
                             print(f"❌ Error: Status {response.status_code}")
                             print(f"Response: {error_text.decode()}")
                             return
-                        
-                        line_count = 0
+                
                         data_received = False
                         try:
-                            async for line in response.aiter_lines():
-                                line_count += 1
+                            async for event in iter_sse_events(response):
+                                event_count += 1
                                 
-                                if not line.strip():
-                                    continue  # Skip empty lines
+                                # Track the spec id: field so a dropped stream
+                                # can resume where it left off
+                                if event.startswith(b"id:") or b"\nid:" in event:
+                                    for id_line in event.split(b"\n"):
+                                        if id_line.startswith(b"id:"):
+                                            last_id = id_line[3:].strip().decode()
                                 
-                                if line.startswith("data: "):
+                                payload = _sse_data(event)
+                                if payload is not None:
                                     try:
-                                        data = json.loads(line[6:])  # Remove "data: " prefix
+                                        data = orjson.loads(payload)
                                         data_received = True
-                                        
-                                        # Handle progress updates - character by character streaming
-                                        if data.get("type") == "progress_char":
-                                            # Character-by-character streaming
-                                            accumulated = data.get("message", "")
-                                            
-                                            # Check if this is the start of a new message
-                                            # New message if: no current message, or accumulated doesn't start with current
-                                            is_new_message = (not current_message or 
-                                                            not accumulated.startswith(current_message))
-                                            
-                                            if is_new_message:
-                                                # Clear previous message and start new one
-                                                if current_message:
-                                                    clear_length = max(len(current_message) + 2, 80)
-                                                    print(f"\r{' ' * clear_length}", end="", flush=True)
-                                            
-                                            # Clear line and print accumulated message
-                                            clear_length = max(len(accumulated) + 2, 80)
-                                            print(f"\r{' ' * clear_length}", end="", flush=True)  # Clear
-                                            print(f"\r🔄 {accumulated}", end="", flush=True)  # Print
-                                            current_message = accumulated
-                                        
-                                        elif data.get("type") == "progress":
-                                            # Complete progress message (final state)
-                                            message = data.get("message", "")
-                                            
-                                            # Ensure complete message is displayed
-                                            if current_message != message:
-                                                clear_length = max(len(current_message) + 2, 80) if current_message else 80
-                                                print(f"\r{' ' * clear_length}", end="", flush=True)
-                                                print(f"\r🔄 {message}", end="", flush=True)
-                                            current_message = message
-                                        
-                                        # Handle results
-                                        elif data.get("type") == "results":
-                                            # Clear the progress line completely
-                                            if current_message:
-                                                clear_length = max(len(current_message) + 2, 80)
-                                                print(f"\r{' ' * clear_length}", end="", flush=True)
-                                            # Move to new line for results
-                                            print()  # New line after clearing progress
-                                            
-                                            print(f"\n{'='*70}")
-                                            print("✅ SEARCH RESULTS:")
-                                            print(f"{'='*70}")
-                                            
-                                            if "properties" in data:
-                                                print("\n📋 Properties Found:")
-                                                for prop in data["properties"]:
-                                                    print(f"\n   • {prop.get('address', 'N/A')}")
-                                                    print(f"     Price: ${prop.get('price', 'N/A'):,} | "
-                                                          f"Bedrooms: {prop.get('bedrooms', 'N/A')} | "
-                                                          f"Bathrooms: {prop.get('bathrooms', 'N/A')} | "
-                                                          f"Size: {prop.get('square_feet', 'N/A')} sq ft")
-                                                    print(f"     Type: {prop.get('property_type', 'N/A')} | "
-                                                          f"Year Built: {prop.get('year_built', 'N/A')}")
-                                                    
-                                                    # Show schools data
-                                                    if "schools" in prop and prop["schools"]:
-                                                        print(f"     🎓 Nearby Schools:")
-                                                        for school in prop["schools"]:
-                                                            print(f"        - {school.get('name', 'N/A')} "
-                                                                  f"(Rating: {school.get('rating', 'N/A')}/10, "
-                                                                  f"Distance: {school.get('distance', 'N/A')}, "
-                                                                  f"Grade: {school.get('grade', 'N/A')})")
-                                            
-                                            if "landmarks" in data:
-                                                print("\n📍 Nearby Landmarks:")
-                                                for landmark in data["landmarks"]:
-                                                    print(f"   • {landmark.get('name', 'N/A')} "
-                                                          f"({landmark.get('distance', 'N/A')}) - "
-                                                          f"{landmark.get('type', 'N/A')}")
-                                            print()
-                                            break  # Exit loop after results
-                                        
+                                
+                                        handler = handlers.get(data.get("type"))
+                                        if handler is not None:
+                                            if handler(data):
+                                                break  # Exit loop after results
+                                
                                         # Handle errors
                                         elif "error" in data:
-                                            # Clear progress line if showing
-                                            if current_message:
-                                                clear_length = max(len(current_message) + 2, 80)
-                                                print(f"\r{' ' * clear_length}", end="", flush=True)
-                                            print()  # New line
+                                            _clear_progress_line(current_message)
                                             print(f"\n❌ Error: {data.get('error')}")
                                             if "details" in data:
                                                 print(f"Details: {data.get('details')}")
                                             return
-                                            
-                                    except json.JSONDecodeError as e:
-                                        # Clear progress line if showing
-                                        if current_message:
-                                            clear_length = max(len(current_message) + 2, 80)
-                                            print(f"\r{' ' * clear_length}", end="", flush=True)
-                                        print()  # New line
+                                    
+                                    except orjson.JSONDecodeError as e:
+                                        _clear_progress_line(current_message)
                                         print(f"\n[Client] Error parsing JSON: {e}")
-                                        print(f"Raw line: {line}")
-                                elif line.strip() and not line.startswith(":"):
-                                    # Handle non-data lines (comments, etc.) - don't print these
-                                    pass  # Silently skip
-                        
-                        except httpx.ReadTimeout:
-                            print(f"\n❌ Read timeout - stream closed unexpectedly (received {line_count} lines)")
+                                        print(f"Raw event: {event!r}")
+                
+                        except (httpx.ReadTimeout, httpx.RemoteProtocolError):
+                            # Reconnect logic in the enclosing loop decides
+                            # whether this drop is resumable
+                            raise
                         except Exception as stream_error:
-                            print(f"\n❌ Stream error: {stream_error} (received {line_count} lines)")
-                            import traceback
+                            print(f"\n❌ Stream error: {stream_error} (received {event_count} events)")
                             traceback.print_exc()
-                        
+                
                         # If we got here without receiving data, show a message
                         if not data_received:
-                            print(f"\n⚠️  No valid data received from stream (received {line_count} lines total).")
+                            print(f"\n⚠️  No valid data received from stream (received {event_count} events total).")
                             print("   Check if ML service is running and responding.")
                             print("   Make sure both ML Service (port 8001) and Backend API (port 8000) are running.")
                             print("   Check the service terminal windows for any error messages.")
-                
-                except httpx.ConnectError:
-                    print(f"❌ Connection Error: Cannot connect to {Client.BACKEND_URL}")
-                    print("   Make sure Backend API is running on port 8000")
-                except httpx.TimeoutException:
-                    print("❌ Timeout Error: Request took too long")
-                except Exception as e:
-                    print(f"❌ Error: {e}")
-                    import traceback
-                    traceback.print_exc()
         
+                    break  # Stream ended normally
+                except (httpx.ReadTimeout, httpx.RemoteProtocolError) as drop:
+                    if last_id is None or attempts_left == 0:
+                        print(f"\n❌ Stream dropped: {drop!r} (received {event_count} events)")
+                        break
+                    attempts_left -= 1
+                    print(f"\n⚠️  Stream dropped; resuming from event id {last_id}...")
+                    await asyncio.sleep(0.1)
+        except httpx.ConnectError:
+            print(f"❌ Connection Error: Cannot connect to {Client.BACKEND_URL}")
+            print("   Make sure Backend API is running on port 8000")
+        except httpx.TimeoutException:
+            print("❌ Timeout Error: Request took too long")
         except KeyboardInterrupt:
             print("\n\n⚠️  Interrupted by user")
         except Exception as e:
-            print(f"\n❌ Unexpected error: {e}")
-            import traceback
+            print(f"❌ Error: {e}")
             traceback.print_exc()
     
     @staticmethod
@@ -685,58 +1103,143 @@ class Client:
         print(f"{'-'*70}\n")
         print("Response: ", end="", flush=True)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            payload = {
-                "property_details": property_details,
-                "user_question": user_question,
-                "chat_history": []
-            }
-            
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{Client.BACKEND_URL}/chat/stream",
-                    json=payload
-                ) as response:
-                    print(f"[Client] Connected to backend, status: {response.status_code}\n")
-                    print("💬 ", end="", flush=True)
+        client = _get_client()
+        
+        # Serialize the body once with orjson instead of letting httpx run
+        # stdlib json.dumps on every call (mirrors the backend proxy, which
+        # also sends pre-serialized bytes)
+        body = orjson.dumps({
+            "property_details": property_details,
+            "user_question": user_question,
+            "chat_history": []
+        })
+        
+        # Coalesce tokens into one stdout write per word boundary instead
+        # of a write+flush syscall pair per token - arrival is bursty, so
+        # batching cuts most syscalls without hurting perceived liveness
+        buf = io.StringIO()
+        
+        def flush_tokens():
+            pending = buf.getvalue()
+            if pending:
+                sys.stdout.write(pending)
+                sys.stdout.flush()
+                buf.seek(0)
+                buf.truncate()
+        
+        try:
+            async with client.stream(
+                "POST",
+                f"{Client.BACKEND_URL}/chat/stream",
+                params={"proto": "raw"},
+                content=body,
+                headers={"content-type": "application/json"}
+            ) as response:
+                print(f"[Client] Connected to backend, status: {response.status_code}\n")
+                print("💬 ", end="", flush=True)
+                
+                async for event in iter_sse_events(response):
+                    # Raw-subprotocol fast path: the token is plain text, so
+                    # no JSON parse and no dict lookups per frame
+                    if event.startswith(b"event: token\ndata: "):
+                        content = event[19:].decode('utf-8')
+                        buf.write(content)
+                        if ' ' in content or '\n' in content or buf.tell() >= 64:
+                            flush_tokens()
+                        continue
                     
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            try:
-                                data = json.loads(line[6:])  # Remove "data: " prefix
+                    payload = _sse_data(event)
+                    if payload is not None:
+                        try:
+                            data = orjson.loads(payload)
+                            
+                            # Handle chat tokens
+                            if data.get("type") == "token":
+                                content = data.get("content", "")
+                                buf.write(content)
+                                if ' ' in content or '\n' in content or buf.tell() >= 64:
+                                    flush_tokens()
+                            elif data.get("type") == "done":
+                                flush_tokens()
+                                print("\n\n✅ [Chat response complete]")
                                 
-                                # Handle chat tokens
-                                if data.get("type") == "token":
-                                    content = data.get("content", "")
-                                    print(content, end="", flush=True)
-                                elif data.get("type") == "done":
-                                    print("\n\n✅ [Chat response complete]")
-                                    
-                            except json.JSONDecodeError as e:
-                                print(f"\n[Client] Error parsing JSON: {e}")
-            except Exception as e:
-                print(f"\n[Client] Error: {e}")
+                        except orjson.JSONDecodeError as e:
+                            print(f"\n[Client] Error parsing JSON: {e}")
+        except Exception as e:
+            print(f"\n[Client] Error: {e}")
+        finally:
+            flush_tokens()
 
 
 # ============================================================================
 # MAIN - Entry point to run different services
 # ============================================================================
 
+def _configure_logging():
+    """Service log setup - INFO keeps the flow visible for the POC; run with
+    STREAMING_POC_LOG=WARNING in production so per-request logs cost nothing"""
+    level = os.environ.get("STREAMING_POC_LOG", "INFO").upper()
+    logging.basicConfig(level=level, format="%(message)s")
+
+
 def run_ml_service():
     """Run ML Service on port 8001"""
+    _configure_logging()
     print("="*70)
     print("Starting ML Service on http://localhost:8001")
     print("="*70)
-    uvicorn.run(ml_app, host="0.0.0.0", port=8001)
+    # Import string + workers scales across cores; uvloop/httptools replace
+    # the Python-level event loop and HTTP parser. access_log=False matters
+    # most here: with it on, every SSE chunk pays access-log formatting.
+    uvicorn.run(
+        "streaming_poc:ml_app",
+        host="0.0.0.0",
+        port=8001,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
 
 
 def run_backend_api():
     """Run Backend API on port 8000"""
+    _configure_logging()
     print("="*70)
     print("Starting Backend API on http://localhost:8000")
     print("="*70)
-    uvicorn.run(backend_app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "streaming_poc:backend_app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
+
+
+# Fixture property for the chat test - built once at import so repeated
+# scripted runs don't re-allocate the literal per invocation. Treated as
+# read-only; a plain dict keeps it directly serializable.
+_DEFAULT_PROPERTY: Dict[str, Any] = {
+    "id": "123",
+    "address": "123 Main Street, San Francisco, CA",
+    "price": 500000,
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "square_feet": 1500,
+    "year_built": 2015,
+    "property_type": "Condo",
+    "schools": [
+        {"name": "Lincoln High School", "rating": 8.5, "distance": "0.3 miles", "grade": "9-12"},
+        {"name": "Roosevelt Elementary", "rating": 9.2, "distance": "0.5 miles", "grade": "K-5"},
+        {"name": "Washington Middle School", "rating": 8.8, "distance": "0.7 miles", "grade": "6-8"},
+        {"name": "Stanford University", "rating": 9.8, "distance": "15 miles", "grade": "University"}
+    ]
+}
 
 
 async def run_test(test_type: str, query: str = None):
@@ -747,23 +1250,7 @@ async def run_test(test_type: str, query: str = None):
             await Client.stream_search(query)
         elif test_type == "chat":
             question = query or "Tell me about this property"
-            property_details = {
-                "id": "123",
-                "address": "123 Main Street, San Francisco, CA",
-                "price": 500000,
-                "bedrooms": 3,
-                "bathrooms": 2,
-                "square_feet": 1500,
-                "year_built": 2015,
-                "property_type": "Condo",
-                "schools": [
-                    {"name": "Lincoln High School", "rating": 8.5, "distance": "0.3 miles", "grade": "9-12"},
-                    {"name": "Roosevelt Elementary", "rating": 9.2, "distance": "0.5 miles", "grade": "K-5"},
-                    {"name": "Washington Middle School", "rating": 8.8, "distance": "0.7 miles", "grade": "6-8"},
-                    {"name": "Stanford University", "rating": 9.8, "distance": "15 miles", "grade": "University"}
-                ]
-            }
-            await Client.stream_chat(property_details, question)
+            await Client.stream_chat(_DEFAULT_PROPERTY, question)
         else:
             print(f"Unknown test type: {test_type}")
             print("Use 'search' or 'chat'")
@@ -778,8 +1265,9 @@ async def run_test(test_type: str, query: str = None):
         print("\n\n⚠️  Test interrupted by user")
     except Exception as e:
         print(f"\n❌ Test error: {e}")
-        import traceback
         traceback.print_exc()
+    finally:
+        await _close_client()
 
 
 def main():